@@ -2,14 +2,14 @@
 Consumidor de mensajes RabbitMQ
 """
 import json
+import time
 import traceback
 from pathlib import Path
 from datetime import datetime
 
 from app.infra.mq import RabbitMQConnection
 from app.infra.dsi_logger import logger
-from app.models import MessagePayload, ErrorReport
-from app.processor import CuentasProcessor
+from app.infra.metrics import metrics
 
 
 class RabbitMQConsumer:
@@ -20,16 +20,24 @@ class RabbitMQConsumer:
     
     def callback(self, ch, method, properties, body):
         """Callback ejecutado al recibir un mensaje"""
+        # Importación diferida: pydantic y dateutil no se cargan hasta el primer mensaje
+        from app.models import MessagePayload
+        from app.processor import CuentasProcessor
+        
         run_id = None
         payload_dict = None
+        start_time = time.time()
+        
+        metrics.inc("rpa_jobs_in_flight")
         
         try:
             # Parsear mensaje
             payload_dict = json.loads(body)
             logger.info("MESSAGE_RECEIVED", "Mensaje recibido", payload=payload_dict)
+            self.observe_queue_wait(properties, payload_dict, start_time)
             
             # Validar payload
-            payload = MessagePayload(**payload_dict)
+            payload = MessagePayload.model_validate(payload_dict)
             run_id = payload.run_id
             
             # Inicializar logger con run_id
@@ -45,19 +53,43 @@ class RabbitMQConsumer:
             if not filepath.exists():
                 raise FileNotFoundError(f"Archivo no encontrado: {payload.archivo}")
             
-            # Procesar archivo
+            # Procesar archivo (perfilado solo si meta.profile está activo)
             processor = CuentasProcessor(run_id)
-            metrics = processor.process_file(str(filepath), payload.umbral_error)
+            process_kwargs = {}
+            if payload.meta.get("partition"):
+                process_kwargs = {
+                    "partition": payload.meta["partition"],
+                    "partition_shards": int(payload.meta.get("partition_shards", 8))
+                }
+            profile_mode = None
+            if payload.meta.get("profile"):
+                from app.profiling import resolve_mode, resolve_top_n, run_profiled
+                profile_mode = resolve_mode(payload.meta["profile"])
+            
+            if profile_mode:
+                run_metrics, perfil = run_profiled(
+                    profile_mode,
+                    resolve_top_n(payload.meta.get("profile_top")),
+                    processor.process_file, str(filepath), payload.umbral_error, **process_kwargs
+                )
+                run_metrics.perfil = perfil
+            else:
+                # Sin perfilar: no dejar perfiles de una corrida anterior junto a las salidas nuevas
+                if any(Path("out").glob("profile*")):
+                    from app.profiling import clear_profiles
+                    clear_profiles(Path("out"))
+                run_metrics = processor.process_file(str(filepath), payload.umbral_error, **process_kwargs)
             
             # Guardar métricas
-            self.save_metrics(metrics)
+            self.save_metrics(run_metrics)
             
             logger.info("END_PROCESSING", 
                        "Procesamiento completado exitosamente",
-                       metricas=metrics.model_dump())
+                       metricas=run_metrics.model_dump())
             
             # ACK del mensaje
             ch.basic_ack(delivery_tag=method.delivery_tag)
+            metrics.inc("rpa_messages_total", resultado="ack")
             logger.info("MESSAGE_ACK", "Mensaje confirmado")
             
         except Exception as e:
@@ -68,7 +100,24 @@ class RabbitMQConsumer:
             
             # NACK del mensaje (no requeue para evitar loops infinitos)
             ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+            metrics.inc("rpa_messages_total", resultado="nack")
             logger.error("MESSAGE_NACK", "Mensaje rechazado")
+        
+        finally:
+            metrics.dec("rpa_jobs_in_flight")
+            metrics.observe("rpa_message_latency_seconds", time.time() - start_time)
+    
+    def observe_queue_wait(self, properties, payload_dict, received_at):
+        """Registra la espera en cola desde el timestamp AMQP o meta.publicado_en (epoch en segundos)"""
+        published_at = getattr(properties, "timestamp", None)
+        if not published_at and isinstance(payload_dict, dict):
+            published_at = (payload_dict.get("meta") or {}).get("publicado_en")
+        
+        try:
+            if published_at:
+                metrics.observe("rpa_queue_wait_seconds", max(received_at - float(published_at), 0.0))
+        except (TypeError, ValueError):
+            logger.error("QUEUE_WAIT", f"Marca de publicación inválida: {published_at!r}")
     
     def save_metrics(self, metrics):
         """Guarda métricas en archivo JSON"""
@@ -84,6 +133,8 @@ class RabbitMQConsumer:
     
     def create_error_report(self, run_id, exception, payload):
         """Crea reporte de error en archivo"""
+        from app.models import ErrorReport
+        
         out_dir = Path("out")
         out_dir.mkdir(exist_ok=True)
         
@@ -0,0 +1,199 @@
+"""
+Métricas en proceso con exposición estilo Prometheus
+"""
+import os
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+from app.infra.dsi_logger import logger
+
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 1800.0, 3600.0)
+
+# Los timestamps AMQP tienen resolución de segundos: buckets por debajo de 1 s no aportan
+QUEUE_WAIT_BUCKETS = (1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0, 7200.0)
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+class _Histogram:
+    """Acumulador de una serie de histograma"""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        idx = bisect_left(self.buckets, value)
+        if idx < len(self.counts):
+            self.counts[idx] += 1
+        self.total += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    """Registro de contadores, gauges e histogramas con formato de texto Prometheus"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._values: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def _declare(self, name: str, kind: str, help_text: str) -> None:
+        if name not in self._help:
+            self._help[name] = (kind, help_text)
+
+    def counter(self, name: str, help_text: str) -> None:
+        """Declara un contador"""
+        with self._lock:
+            self._declare(name, "counter", help_text)
+            self._values.setdefault(name, {})
+
+    def gauge(self, name: str, help_text: str) -> None:
+        """Declara un gauge"""
+        with self._lock:
+            self._declare(name, "gauge", help_text)
+            self._values.setdefault(name, {})
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        """Declara un histograma"""
+        with self._lock:
+            self._declare(name, "histogram", help_text)
+            self._histograms.setdefault(name, {})
+            self._buckets[name] = tuple(sorted(buckets))
+
+    def inc(self, name: str, amount: float = 1.0, **labels) -> None:
+        """Incrementa un contador o gauge"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._values[name]
+            series[key] = series.get(key, 0.0) + amount
+
+    def dec(self, name: str, amount: float = 1.0, **labels) -> None:
+        """Decrementa un gauge"""
+        self.inc(name, -amount, **labels)
+
+    def set(self, name: str, value: float, **labels) -> None:
+        """Fija el valor de un gauge"""
+        key = _label_key(labels)
+        with self._lock:
+            self._values[name][key] = value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Registra una observación en un histograma"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms[name]
+            if key not in series:
+                series[key] = _Histogram(self._buckets[name])
+            series[key].observe(value)
+
+    def get(self, name: str, **labels) -> float:
+        """Retorna el valor actual de un contador o gauge (0 si no existe)"""
+        with self._lock:
+            return self._values.get(name, {}).get(_label_key(labels), 0.0)
+
+    def render(self) -> str:
+        """Serializa el registro en formato de exposición de texto Prometheus"""
+        lines = []
+        with self._lock:
+            for name, (kind, help_text) in self._help.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind == "histogram":
+                    for key, hist in self._histograms[name].items():
+                        cumulative = 0
+                        for bound, count in zip(hist.buckets, hist.counts):
+                            cumulative += count
+                            lines.append(f"{name}_bucket{_format_labels(key, ('le', repr(float(bound))))} {cumulative}")
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {hist.total}")
+                        lines.append(f"{name}_sum{_format_labels(key)} {hist.sum}")
+                        lines.append(f"{name}_count{_format_labels(key)} {hist.total}")
+                else:
+                    for key, value in self._values[name].items():
+                        lines.append(f"{name}{_format_labels(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def start_http_server(self, port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+        """Expone /metrics por HTTP en un hilo daemon"""
+        registry = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        thread = threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True)
+        thread.start()
+        logger.info("METRICS_SERVER", f"Métricas expuestas en http://{host}:{self._server.server_port}/metrics")
+        return self._server
+
+    def stop_http_server(self) -> None:
+        """Detiene el servidor HTTP si está activo"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def start_metrics_server() -> Optional[ThreadingHTTPServer]:
+    """Inicia el endpoint según METRICS_PORT / METRICS_HOST (METRICS_PORT=0 lo desactiva)"""
+    port = int(os.getenv("METRICS_PORT", "9108"))
+    if port <= 0:
+        return None
+    
+    # El endpoint es opcional: un puerto ocupado no debe detener el consumidor
+    try:
+        return metrics.start_http_server(port, os.getenv("METRICS_HOST", "0.0.0.0"))
+    except OSError as e:
+        logger.error("METRICS_SERVER", f"No se pudo exponer métricas en el puerto {port}: {e}")
+        return None
+
+
+# Instancia global del registro
+metrics = MetricsRegistry()
+
+metrics.counter("rpa_rows_processed_total", "Filas procesadas por resultado")
+metrics.counter("rpa_invalid_rows_total", "Filas inválidas por motivo")
+metrics.counter("rpa_messages_total", "Mensajes procesados por resultado (ack/nack)")
+metrics.histogram("rpa_message_latency_seconds", "Latencia de procesamiento por mensaje")
+metrics.histogram("rpa_queue_wait_seconds", "Tiempo de espera en cola desde la publicación", QUEUE_WAIT_BUCKETS)
+metrics.gauge("rpa_jobs_in_flight", "Mensajes en procesamiento")
+metrics.gauge("rpa_run_rows_read", "Filas leídas en la corrida actual")
+metrics.gauge("rpa_run_bytes_read", "Bytes leídos en la corrida actual")
+metrics.gauge("rpa_run_bytes_total", "Tamaño en bytes del archivo de la corrida actual")
+metrics.gauge("rpa_run_eta_seconds", "Tiempo estimado restante de la corrida actual")
@@ -3,6 +3,7 @@
 # """
 # import pika
 # import os
+# import time
 # from typing import Optional
 # from app.infra.dsi_logger import logger
 
@@ -79,7 +80,8 @@
 #             body=message,
 #             properties=pika.BasicProperties(
 #                 delivery_mode=2,  # Mensaje persistente
-#                 content_type='application/json'
+#                 content_type='application/json',
+#                 timestamp=int(time.time())  # Permite medir la espera en cola
 #             )
 #         )
 #         logger.info("MQ_PUBLISH", f"Mensaje publicado en {self.queue_name}")
\ No newline at end of file
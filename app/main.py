@@ -1,25 +1,59 @@
 """
 Punto de entrada del RPA Normalizador de Cuentas
 """
+import time
+
+_IMPORT_START = time.perf_counter()
+
 import os
 from pathlib import Path
-from dotenv import load_dotenv
 
 from app.consumer import RabbitMQConsumer
+from app.infra.dsi_logger import logger
+from app.infra.metrics import start_metrics_server
+
+IMPORT_MS = (time.perf_counter() - _IMPORT_START) * 1000
+
+# Presupuesto de arranque del worker (imports + configuración) en milisegundos
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "250"))
+
+
+def report_startup(setup_ms: float) -> None:
+    """Imprime y registra el tiempo de arranque frente al presupuesto"""
+    total_ms = IMPORT_MS + setup_ms
+    
+    print(f"Arranque: {total_ms:.1f} ms (imports {IMPORT_MS:.1f} ms, "
+          f"configuración {setup_ms:.1f} ms, presupuesto {STARTUP_BUDGET_MS:.0f} ms)")
+    
+    kv = dict(import_ms=round(IMPORT_MS, 1),
+              setup_ms=round(setup_ms, 1),
+              total_ms=round(total_ms, 1),
+              budget_ms=STARTUP_BUDGET_MS)
+    if total_ms > STARTUP_BUDGET_MS:
+        logger.error("STARTUP", "Arranque por encima del presupuesto", **kv)
+    else:
+        logger.info("STARTUP", "Arranque dentro del presupuesto", **kv)
 
 
 def main():
     """Función principal"""
+    setup_start = time.perf_counter()
+    
     # Cargar variables de entorno
     env_file = Path(".env")
     if env_file.exists():
+        from dotenv import load_dotenv
         load_dotenv(env_file)
     
     # Crear directorio de salida
     Path("out").mkdir(exist_ok=True)
     
+    # Exponer métricas en vivo (METRICS_PORT=0 lo desactiva)
+    start_metrics_server()
+    
     # Iniciar consumidor
     consumer = RabbitMQConsumer()
+    report_startup((time.perf_counter() - setup_start) * 1000)
     consumer.start_consuming()
 
 
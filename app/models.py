@@ -2,7 +2,7 @@
 Modelos de datos y validaciones
 """
 from typing import Optional, Dict, Any
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field
 from datetime import datetime, UTC # Importa datetime y el nuevo objeto UTC
 
 
@@ -13,13 +13,6 @@ class MessagePayload(BaseModel):
     operacion: str
     umbral_error: float = Field(ge=0.0, le=1.0)
     meta: Dict[str, Any] = Field(default_factory=dict)
-    
-    @field_validator('umbral_error')
-    @classmethod
-    def validate_umbral(cls, v):
-        if not 0 <= v <= 1:
-            raise ValueError("umbral_error debe estar entre 0 y 1")
-        return v
 
 
 class CuentaRow(BaseModel):
@@ -39,6 +32,8 @@ class ProcessingMetrics(BaseModel):
     porcentaje_invalidos: float
     duracion_ms: float
     timestamp: str = Field(default_factory=lambda: datetime.now(UTC).isoformat())
+    perfil: Optional[Dict[str, Any]] = None
+    particiones: Optional[Dict[str, Any]] = None
 
 
 class ErrorReport(BaseModel):
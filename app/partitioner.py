@@ -0,0 +1,129 @@
+"""
+Escritura particionada de la salida normalizada
+"""
+import csv
+import json
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from app.infra.dsi_logger import logger
+
+
+MODOS_PARTICION = {"estado", "mes", "hash"}
+
+
+def partition_key_fn(modo: str, shards: int = 8) -> Callable[[Dict], str]:
+    """Retorna la función que asigna cada registro normalizado a su partición"""
+    if modo == "estado":
+        return lambda row: f"estado={row['estado']}"
+    if modo == "mes":
+        return lambda row: f"mes={row['fecha_emision'][:7]}"
+    if modo == "hash":
+        if shards < 1:
+            raise ValueError(f"partition_shards debe ser >= 1: {shards}")
+        width = len(str(shards - 1))
+        return lambda row: f"shard={zlib.crc32(row['id_cuenta'].encode('utf-8')) % shards:0{width}d}"
+    raise ValueError(f"Partición inválida: {modo!r} (usar {', '.join(sorted(MODOS_PARTICION))})")
+
+
+def clear_partitions(out_dir: Path) -> None:
+    """Elimina particiones y manifiesto de una corrida anterior"""
+    if not out_dir.is_dir():
+        return
+    for stale in list(out_dir.glob("*.csv")) + [out_dir / "manifest.json"]:
+        stale.unlink(missing_ok=True)
+
+
+class PartitionedWriter:
+    """Enruta registros a un CSV por partición con buffers y handles abiertos acotados"""
+
+    def __init__(self, out_dir: Path, fieldnames: List[str], max_open: int = 32, buffer_rows: int = 1000):
+        self.out_dir = out_dir
+        self.fieldnames = fieldnames
+        self.max_open = max_open
+        self.buffer_rows = buffer_rows
+        self.handles: "OrderedDict[str, tuple]" = OrderedDict()
+        self.buffers: Dict[str, List[Dict]] = {}
+        self.counts: Dict[str, int] = {}
+
+        clear_partitions(self.out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, key: str) -> Path:
+        return self.out_dir / f"{key}.csv"
+
+    def write(self, key: str, row: Dict) -> None:
+        """Agrega un registro al buffer de su partición"""
+        buffer = self.buffers.setdefault(key, [])
+        buffer.append(row)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        if len(buffer) >= self.buffer_rows:
+            self._flush(key)
+
+    def _flush(self, key: str) -> None:
+        rows = self.buffers.pop(key, None)
+        if rows:
+            self._writer(key).writerows(rows)
+
+    def _writer(self, key: str) -> csv.DictWriter:
+        if key in self.handles:
+            self.handles.move_to_end(key)
+            return self.handles[key][1]
+
+        # Cerrar el handle usado hace más tiempo si se alcanzó el límite
+        if len(self.handles) >= self.max_open:
+            _, (old_file, _) = self.handles.popitem(last=False)
+            old_file.close()
+
+        path = self.path_for(key)
+        is_new = not path.exists()
+        f = open(path, "w" if is_new else "a", newline="", encoding="utf-8")
+        writer = csv.DictWriter(f, fieldnames=self.fieldnames)
+        if is_new:
+            writer.writeheader()
+        self.handles[key] = (f, writer)
+        return writer
+
+    def close(self) -> List[Dict]:
+        """Vacía los buffers, cierra los archivos y retorna las particiones escritas"""
+        for key in list(self.buffers):
+            self._flush(key)
+        for f, _ in self.handles.values():
+            f.close()
+        self.handles.clear()
+
+        return [
+            {"particion": key, "archivo": str(self.path_for(key)), "filas": self.counts[key]}
+            for key in sorted(self.counts)
+        ]
+
+
+def write_partitioned(rows: List[Dict], out_dir: Path, fieldnames: List[str], modo: str,
+                      shards: int = 8, run_id: Optional[str] = None) -> Dict:
+    """Escribe los registros por partición y guarda manifest.json en out_dir"""
+    key_fn = partition_key_fn(modo, shards)
+    writer = PartitionedWriter(out_dir, fieldnames)
+    try:
+        for row in rows:
+            writer.write(key_fn(row), row)
+    finally:
+        particiones = writer.close()
+
+    manifest = {
+        "run_id": run_id,
+        "modo": modo,
+        "shards": shards if modo == "hash" else None,
+        "total_filas": sum(p["filas"] for p in particiones),
+        "particiones": particiones
+    }
+    manifest_file = out_dir / "manifest.json"
+    with open(manifest_file, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    logger.info("SAVE_PARTITIONS",
+               f"Guardadas {len(particiones)} particiones ({modo}) en {out_dir}",
+               manifiesto=str(manifest_file),
+               total_filas=manifest["total_filas"])
+    return manifest
@@ -3,25 +3,36 @@ Procesador de normalización de cuentas
 """
 import csv
 import json
+import os
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 from dateutil import parser
 
 from app.infra.dsi_logger import logger
+from app.infra.metrics import metrics
 from app.models import ProcessingMetrics
+from app.partitioner import clear_partitions, partition_key_fn, write_partitioned
 
 
 class CuentasProcessor:
     """Procesador de normalización de archivos CSV de cuentas"""
     
     ESTADOS_VALIDOS = {"PENDIENTE", "ENVIADA", "APROBADA", "RECHAZADA"}
+    FIELDNAMES = ["id_cuenta", "fecha_emision", "monto", "estado"]
+    PARTITION_DIR = Path("out") / "cuentas_normalizadas"
+    PROGRESS_INTERVAL_S = float(os.getenv("PROGRESS_INTERVAL_S", "5"))
+    PROGRESS_CHECK_ROWS = 1000
     
     def __init__(self, run_id: str):
         self.run_id = run_id
         self.registros_validos: List[Dict] = []
         self.registros_invalidos: List[Dict] = []
+        self.bytes_leidos = 0
+        self.bytes_totales = 0
+        self._reportados_validos = 0
+        self._reportados_invalidos = 0
     
     def normalize_id_cuenta(self, id_cuenta: str) -> Tuple[bool, str]:
         """Normaliza id_cuenta: strip, mayúsculas, alfanumérico no vacío"""
@@ -123,21 +134,42 @@ class CuentasProcessor:
         })
         return True
     
-    def process_file(self, filepath: str, umbral_error: float) -> ProcessingMetrics:
+    def process_file(self, filepath: str, umbral_error: float,
+                     partition: Optional[str] = None, partition_shards: int = 8) -> ProcessingMetrics:
         """Procesa el archivo CSV completo"""
         start_time = time.time()
         
         logger.info("READ_CSV", f"Leyendo archivo: {filepath}")
         
         try:
+            # Validar la partición antes de leer para fallar rápido
+            if partition:
+                partition_key_fn(partition, partition_shards)
+            
+            self.bytes_totales = os.path.getsize(filepath)
+            next_progress = time.time() + self.PROGRESS_INTERVAL_S
+            ultimo_reporte = 0
+            
             with open(filepath, "r", encoding="utf-8") as f:
                 reader = csv.DictReader(f)
                 
                 for idx, row in enumerate(reader, start=1):
                     self.process_row(row, idx)
+                    
+                    # Revisar el reloj solo cada PROGRESS_CHECK_ROWS filas
+                    if idx % self.PROGRESS_CHECK_ROWS == 0 and time.time() >= next_progress:
+                        # f.tell() no está disponible al iterar; el buffer adelanta a lo sumo un bloque
+                        self.bytes_leidos = f.buffer.tell()
+                        self.report_progress(idx, start_time)
+                        ultimo_reporte = idx
+                        next_progress = time.time() + self.PROGRESS_INTERVAL_S
+                
+                self.bytes_leidos = f.buffer.tell()
             
             # Calcular métricas
             total = len(self.registros_validos) + len(self.registros_invalidos)
+            if total != ultimo_reporte:
+                self.report_progress(total, start_time)
             porcentaje_invalidos = len(self.registros_invalidos) / total if total > 0 else 0
             duracion_ms = (time.time() - start_time) * 1000
             
@@ -155,36 +187,86 @@ class CuentasProcessor:
                 )
             
             # Guardar archivos de salida
-            self.save_output()
+            manifest = self.save_output(partition, partition_shards)
             
             # Crear métricas
-            metrics = ProcessingMetrics(
+            run_metrics = ProcessingMetrics(
                 run_id=self.run_id,
                 totales=total,
                 validos=len(self.registros_validos),
                 invalidos=len(self.registros_invalidos),
                 porcentaje_invalidos=round(porcentaje_invalidos * 100, 2),
-                duracion_ms=round(duracion_ms, 2)
+                duracion_ms=round(duracion_ms, 2),
+                particiones={
+                    "modo": manifest["modo"],
+                    "manifiesto": str(self.PARTITION_DIR / "manifest.json"),
+                    "archivos": len(manifest["particiones"])
+                } if manifest else None
             )
             
-            return metrics
+            return run_metrics
             
         except Exception as e:
             logger.error("PROCESS_ERROR", f"Error procesando archivo: {e}")
             raise
     
-    def save_output(self):
-        """Guarda archivos de salida"""
+    def flush_row_metrics(self):
+        """Publica en el registro de métricas las filas procesadas desde el último envío"""
+        nuevos_validos = len(self.registros_validos) - self._reportados_validos
+        if nuevos_validos:
+            metrics.inc("rpa_rows_processed_total", nuevos_validos, resultado="valido")
+        
+        nuevos_invalidos = self.registros_invalidos[self._reportados_invalidos:]
+        if nuevos_invalidos:
+            metrics.inc("rpa_rows_processed_total", len(nuevos_invalidos), resultado="invalido")
+            for registro in nuevos_invalidos:
+                metrics.inc("rpa_invalid_rows_total", reason=registro["reason"])
+        
+        self._reportados_validos = len(self.registros_validos)
+        self._reportados_invalidos = len(self.registros_invalidos)
+    
+    def report_progress(self, filas_leidas: int, start_time: float):
+        """Emite el avance de la corrida: filas y bytes leídos y ETA estimado"""
+        self.flush_row_metrics()
+        
+        transcurrido = time.time() - start_time
+        fraccion = self.bytes_leidos / self.bytes_totales if self.bytes_totales else 0
+        eta_s = transcurrido * (1 - fraccion) / fraccion if fraccion > 0 else None
+        
+        metrics.set("rpa_run_rows_read", filas_leidas)
+        metrics.set("rpa_run_bytes_read", self.bytes_leidos)
+        metrics.set("rpa_run_bytes_total", self.bytes_totales)
+        if eta_s is not None:
+            metrics.set("rpa_run_eta_seconds", round(eta_s, 1))
+        
+        logger.info("PROGRESS",
+                   f"Leídas {filas_leidas} filas ({fraccion:.1%} del archivo)",
+                   filas_leidas=filas_leidas,
+                   bytes_leidos=self.bytes_leidos,
+                   bytes_totales=self.bytes_totales,
+                   eta_s=round(eta_s, 1) if eta_s is not None else None)
+    
+    def save_output(self, partition: Optional[str] = None, partition_shards: int = 8) -> Optional[Dict]:
+        """Guarda archivos de salida. Con partition retorna el manifiesto de particiones"""
         out_dir = Path("out")
         out_dir.mkdir(exist_ok=True)
         
-        # Guardar CSV normalizado
+        output_file = out_dir / "cuentas_normalizadas.csv"
+        
+        # Guardar CSV particionado para cargas paralelas (sin dejar el CSV único de otra corrida)
+        if partition:
+            output_file.unlink(missing_ok=True)
+            return write_partitioned(self.registros_validos, self.PARTITION_DIR,
+                                     self.FIELDNAMES, partition, partition_shards, self.run_id)
+        
+        # Guardar CSV normalizado (sin dejar particiones de otra corrida)
+        clear_partitions(self.PARTITION_DIR)
         if self.registros_validos:
-            output_file = out_dir / "cuentas_normalizadas.csv"
             logger.info("SAVE_OUTPUT", f"Guardando {len(self.registros_validos)} registros en {output_file}")
             
             with open(output_file, "w", newline="", encoding="utf-8") as f:
-                fieldnames = ["id_cuenta", "fecha_emision", "monto", "estado"]
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                writer = csv.DictWriter(f, fieldnames=self.FIELDNAMES)
                 writer.writeheader()
-                writer.writerows(self.registros_validos)
\ No newline at end of file
+                writer.writerows(self.registros_validos)
+        
+        return None
@@ -0,0 +1,160 @@
+"""
+Perfilado bajo demanda de una corrida (cProfile o muestreo)
+"""
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.infra.dsi_logger import logger
+
+
+MODOS = {"cprofile", "sampling"}
+VERDADEROS = {"true", "1", "yes", "y", "on", "si", "sí"}
+FALSOS = {"false", "0", "no", "n", "off", ""}
+TOP_N_DEFAULT = 20
+PROFILE_FILES = ("profile.prof", "profile.collapsed", "profile_top.txt")
+
+
+def resolve_mode(flag: Any) -> Optional[str]:
+    """Traduce meta.profile a un modo de perfilado; None si no se debe perfilar.
+
+    Un valor no reconocido solo genera una advertencia: una opción de diagnóstico
+    nunca debe rechazar el mensaje.
+    """
+    if isinstance(flag, bool):
+        return "cprofile" if flag else None
+
+    valor = str(flag).strip().lower()
+    if valor in MODOS:
+        return valor
+    if valor in VERDADEROS:
+        return "cprofile"
+    if valor not in FALSOS:
+        logger.error("PROFILE_FLAG", f"meta.profile no reconocido: {flag!r}; se procesa sin perfilar")
+    return None
+
+
+def resolve_top_n(value: Any) -> int:
+    """Tamaño del resumen de funciones calientes (meta.profile_top)"""
+    try:
+        top_n = int(value)
+        return top_n if top_n > 0 else TOP_N_DEFAULT
+    except (TypeError, ValueError):
+        return TOP_N_DEFAULT
+
+
+def clear_profiles(out_dir: Path) -> None:
+    """Elimina los perfiles de una corrida anterior"""
+    for name in PROFILE_FILES:
+        (out_dir / name).unlink(missing_ok=True)
+
+
+class SamplingProfiler:
+    """Perfilador por muestreo: captura periódicamente la pila de un hilo"""
+
+    def __init__(self, interval_s: float = 0.005):
+        self.interval_s = interval_s
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self.self_counts: Counter = Counter()
+        self.total_counts: Counter = Counter()
+        self._target_id = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._target_id = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self._target_id)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.reverse()
+
+            self.samples += 1
+            self.stacks[";".join(stack)] += 1
+            self.self_counts[stack[-1]] += 1
+            for func in set(stack):
+                self.total_counts[func] += 1
+
+    def dump(self, path: Path):
+        """Guarda las pilas en formato colapsado (compatible con flamegraph)"""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def summary(self, top_n: int) -> str:
+        lines = [f"Muestras: {self.samples} (intervalo {self.interval_s * 1000:.1f} ms)", "",
+                 f"{'propio %':>9} {'total %':>9}  función"]
+        for func, count in self.self_counts.most_common(top_n):
+            lines.append(f"{count / self.samples:>9.1%} {self.total_counts[func] / self.samples:>9.1%}  {func}")
+        return "\n".join(lines) + "\n"
+
+
+def run_profiled(mode: str, top_n: int, func: Callable, *args, **kwargs) -> Tuple[Any, Dict[str, Any]]:
+    """Ejecuta func bajo el perfilador y guarda el volcado y el resumen en out/"""
+    out_dir = Path("out")
+    out_dir.mkdir(exist_ok=True)
+    clear_profiles(out_dir)
+    summary_file = out_dir / "profile_top.txt"
+
+    logger.info("PROFILE_START", f"Perfilando corrida en modo {mode}")
+    start_time = time.time()
+
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            dump_file = out_dir / "profile.prof"
+            profiler.dump_stats(str(dump_file))
+
+            # Funciones calientes por tiempo propio, luego por tiempo acumulado como contexto
+            stream = io.StringIO()
+            stats = pstats.Stats(profiler, stream=stream)
+            stream.write(f"=== Top {top_n} por tiempo propio (tottime) ===\n")
+            stats.sort_stats("tottime").print_stats(top_n)
+            stream.write(f"\n=== Top {top_n} por tiempo acumulado (cumulative) ===\n")
+            stats.sort_stats("cumulative").print_stats(top_n)
+            summary_file.write_text(stream.getvalue(), encoding="utf-8")
+    else:
+        profiler = SamplingProfiler()
+        profiler.start()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            profiler.stop()
+            dump_file = out_dir / "profile.collapsed"
+            profiler.dump(dump_file)
+            summary_file.write_text(profiler.summary(top_n), encoding="utf-8")
+
+    perfil = {
+        "modo": mode,
+        "duracion_ms": round((time.time() - start_time) * 1000, 2),
+        "volcado": str(dump_file),
+        "resumen": str(summary_file)
+    }
+    logger.info("PROFILE_END", f"Perfil guardado en {dump_file}", **perfil)
+
+    return result, perfil
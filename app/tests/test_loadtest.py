@@ -0,0 +1,69 @@
+"""
+Tests de la prueba de carga end-to-end con canal simulado
+"""
+import random
+
+from app.infra.dsi_logger import logger
+from tools.loadtest import FakeChannel, generate_csv, percentile, run_load_test
+
+
+def test_generate_csv_error_rate(tmp_path):
+    """Test proporción exacta de filas inválidas"""
+    invalidas = generate_csv(tmp_path / "c.csv", 200, 0.1, random.Random(1))
+    
+    assert invalidas == 20
+    assert len((tmp_path / "c.csv").read_text(encoding="utf-8").splitlines()) == 201
+
+
+def test_fake_channel_delivery_order():
+    """Test entrega en orden y registro de ACK/NACK"""
+    channel = FakeChannel()
+    recibidos = []
+    
+    def callback(ch, method, properties, body):
+        recibidos.append(body)
+        if method.delivery_tag % 2:
+            ch.basic_ack(delivery_tag=method.delivery_tag)
+        else:
+            ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+    
+    channel.basic_consume(queue="q", on_message_callback=callback)
+    for body in ("a", "b", "c"):
+        channel.publish(body)
+    channel.start_consuming()
+    
+    assert recibidos == [b"a", b"b", b"c"]
+    assert channel.acks == [1, 3] and channel.nacks == [2]
+
+
+def test_percentile():
+    """Test percentil por rango más cercano"""
+    assert percentile([5, 1, 3, 2, 4], 50) == 3
+    assert percentile(list(range(1, 101)), 99) == 99
+
+
+def test_run_load_test_ack_nack(tmp_path, monkeypatch):
+    """Test consumidor -> procesador -> salida con ACK/NACK correctos"""
+    for attr in ("bot_name", "run_id", "log_file"):
+        monkeypatch.setattr(logger, attr, getattr(logger, attr))
+    
+    report = run_load_test(messages=12, row_sizes=[20, 200], error_rates=[0.0, 0.5],
+                           umbral=0.15, missing_rate=0.2, seed=7, workdir=tmp_path)
+    
+    assert report["incorrectos"] == []
+    assert report["ack"] + report["nack"] == 12
+    assert report["ack"] == report["ack_esperados"] > 0
+    assert report["nack"] > 0
+    assert report["latencia_p99_ms"] >= report["latencia_p50_ms"] > 0
+    assert (tmp_path / "out" / "metrics.json").exists()
+
+
+def test_run_load_test_empty_files(tmp_path, monkeypatch):
+    """Test archivos sin filas: se esperan y reciben ACK"""
+    for attr in ("bot_name", "run_id", "log_file"):
+        monkeypatch.setattr(logger, attr, getattr(logger, attr))
+    
+    report = run_load_test(messages=3, row_sizes=[0], error_rates=[0.5], workdir=tmp_path)
+    
+    assert report["incorrectos"] == []
+    assert report["ack"] == 3
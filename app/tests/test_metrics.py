@@ -0,0 +1,86 @@
+"""
+Tests para el registro de métricas
+"""
+import urllib.request
+
+from app.infra.metrics import MetricsRegistry
+
+
+def test_counter_labels_render():
+    """Test contador con etiquetas en formato Prometheus"""
+    registry = MetricsRegistry()
+    registry.counter("filas_total", "Filas")
+    
+    registry.inc("filas_total", reason="monto_invalido")
+    registry.inc("filas_total", 2, reason="monto_invalido")
+    
+    assert registry.get("filas_total", reason="monto_invalido") == 3
+    assert 'filas_total{reason="monto_invalido"} 3.0' in registry.render()
+
+
+def test_histogram_buckets_cumulative():
+    """Test histograma con buckets acumulados"""
+    registry = MetricsRegistry()
+    registry.histogram("latencia", "Latencia", buckets=(0.1, 1.0))
+    
+    registry.observe("latencia", 0.05)
+    registry.observe("latencia", 0.5)
+    registry.observe("latencia", 5.0)
+    
+    text = registry.render()
+    assert 'latencia_bucket{le="0.1"} 1' in text
+    assert 'latencia_bucket{le="1.0"} 2' in text
+    assert 'latencia_bucket{le="+Inf"} 3' in text
+    assert "latencia_count 3" in text
+
+
+def test_http_endpoint():
+    """Test endpoint /metrics"""
+    registry = MetricsRegistry()
+    registry.gauge("en_vuelo", "En vuelo")
+    registry.set("en_vuelo", 1)
+    
+    server = registry.start_http_server(0, host="127.0.0.1")
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/metrics"
+        body = urllib.request.urlopen(url, timeout=5).read().decode("utf-8")
+    finally:
+        registry.stop_http_server()
+    
+    assert "# TYPE en_vuelo gauge" in body
+    assert "en_vuelo 1" in body
+
+
+def test_queue_wait_from_payload():
+    """Test espera en cola con meta.publicado_en cuando no hay timestamp AMQP"""
+    from types import SimpleNamespace
+    from app.consumer import RabbitMQConsumer
+    from app.infra.metrics import metrics
+    
+    def wait_sum():
+        for line in metrics.render().splitlines():
+            if line.startswith("rpa_queue_wait_seconds_sum"):
+                return float(line.split()[-1])
+        return 0.0
+    
+    consumer = RabbitMQConsumer.__new__(RabbitMQConsumer)
+    antes = wait_sum()
+    
+    consumer.observe_queue_wait(SimpleNamespace(timestamp=None), {"meta": {"publicado_en": 100.0}}, 130.0)
+    
+    assert wait_sum() == antes + 30.0
+    assert 'rpa_queue_wait_seconds_bucket{le="1.0"}' in metrics.render()
+
+
+def test_metrics_server_port_in_use(monkeypatch):
+    """Test que un puerto ocupado no impida arrancar el consumidor"""
+    import socket
+    from app.infra.metrics import start_metrics_server
+    
+    with socket.socket() as ocupado:
+        ocupado.bind(("127.0.0.1", 0))
+        ocupado.listen()
+        monkeypatch.setenv("METRICS_HOST", "127.0.0.1")
+        monkeypatch.setenv("METRICS_PORT", str(ocupado.getsockname()[1]))
+        
+        assert start_metrics_server() is None
@@ -0,0 +1,73 @@
+"""
+Tests para la salida particionada
+"""
+import csv
+import json
+
+import pytest
+from app.partitioner import PartitionedWriter, partition_key_fn, write_partitioned
+from app.processor import CuentasProcessor
+
+
+FIELDNAMES = ["id_cuenta", "fecha_emision", "monto", "estado"]
+
+ROWS = [
+    {"id_cuenta": "CX-001", "fecha_emision": "2024-01-05", "monto": 1000.0, "estado": "ENVIADA"},
+    {"id_cuenta": "AX-002", "fecha_emision": "2024-02-05", "monto": 2500.5, "estado": "APROBADA"},
+    {"id_cuenta": "BX-003", "fecha_emision": "2024-01-20", "monto": 10.0, "estado": "ENVIADA"},
+]
+
+
+def test_partition_key_fn():
+    """Test claves de partición por estado, mes y hash"""
+    assert partition_key_fn("estado")(ROWS[0]) == "estado=ENVIADA"
+    assert partition_key_fn("mes")(ROWS[0]) == "mes=2024-01"
+    
+    shard = partition_key_fn("hash", 16)(ROWS[0])
+    assert shard == partition_key_fn("hash", 16)(dict(ROWS[0]))
+    assert shard.startswith("shard=") and len(shard) == len("shard=00")
+    
+    with pytest.raises(ValueError):
+        partition_key_fn("cliente")
+
+
+def test_write_partitioned_manifest(tmp_path):
+    """Test archivos por partición y conteos del manifiesto"""
+    manifest = write_partitioned(ROWS, tmp_path, FIELDNAMES, "mes", run_id="r")
+    
+    assert manifest["total_filas"] == 3
+    assert {p["particion"]: p["filas"] for p in manifest["particiones"]} == {"mes=2024-01": 2, "mes=2024-02": 1}
+    assert json.loads((tmp_path / "manifest.json").read_text(encoding="utf-8")) == manifest
+    
+    with open(tmp_path / "mes=2024-01.csv", newline="", encoding="utf-8") as f:
+        assert [r["id_cuenta"] for r in csv.DictReader(f)] == ["CX-001", "BX-003"]
+
+
+def test_writer_bounded_handles(tmp_path):
+    """Test que reabrir una partición desalojada no duplica el encabezado"""
+    writer = PartitionedWriter(tmp_path, FIELDNAMES, max_open=1, buffer_rows=1)
+    for row in ROWS:
+        writer.write(f"estado={row['estado']}", row)
+        assert len(writer.handles) <= 1
+    writer.close()
+    
+    lines = (tmp_path / "estado=ENVIADA.csv").read_text(encoding="utf-8").splitlines()
+    assert lines[0] == ",".join(FIELDNAMES)
+    assert len(lines) == 3
+
+
+def test_switching_modes_removes_stale_output(tmp_path, monkeypatch):
+    """Test que cambiar de modo no deje salidas de la corrida anterior"""
+    monkeypatch.chdir(tmp_path)
+    processor = CuentasProcessor("test-run")
+    processor.registros_validos = list(ROWS)
+    partition_dir = tmp_path / CuentasProcessor.PARTITION_DIR
+    
+    processor.save_output()
+    processor.save_output("estado")
+    assert not (tmp_path / "out" / "cuentas_normalizadas.csv").exists()
+    assert (partition_dir / "manifest.json").exists()
+    
+    processor.save_output()
+    assert (tmp_path / "out" / "cuentas_normalizadas.csv").exists()
+    assert list(partition_dir.iterdir()) == []
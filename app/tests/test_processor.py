@@ -2,6 +2,7 @@
 Tests para el procesador de cuentas
 """
 import pytest
+from app.infra.metrics import metrics
 from app.processor import CuentasProcessor
 
 
@@ -121,4 +122,42 @@ def test_process_row_invalid():
     result = processor.process_row(row, 1)
     assert result is False
     assert len(processor.registros_validos) == 0
-    assert len(processor.registros_invalidos) == 1
\ No newline at end of file
+    assert len(processor.registros_invalidos) == 1
+
+
+def test_process_file_progress(tmp_path, monkeypatch):
+    """Test avance de lectura y métricas por motivo de invalidez"""
+    monkeypatch.chdir(tmp_path)
+    csv_file = tmp_path / "cuentas.csv"
+    csv_file.write_text(
+        "id_cuenta,fecha_emision,monto,estado\n"
+        "cx-001,2024/01/05,1000,enviada\n"
+        "cx-002,2024/01/06,-5,enviada\n",
+        encoding="utf-8"
+    )
+    processor = CuentasProcessor("test-run")
+    antes = metrics.get("rpa_invalid_rows_total", reason="monto_invalido")
+    
+    result = processor.process_file(str(csv_file), 1.0)
+    
+    assert result.totales == 2
+    assert processor.bytes_leidos == processor.bytes_totales == csv_file.stat().st_size
+    assert metrics.get("rpa_invalid_rows_total", reason="monto_invalido") == antes + 1
+    assert metrics.get("rpa_run_rows_read") == 2
+
+
+def test_process_file_cr_line_endings(tmp_path, monkeypatch):
+    """Test archivo con fin de línea solo CR (exportaciones legacy)"""
+    monkeypatch.chdir(tmp_path)
+    csv_file = tmp_path / "cuentas_cr.csv"
+    csv_file.write_bytes(
+        b"id_cuenta,fecha_emision,monto,estado\r"
+        b"cx-001,2024/01/05,1000,enviada\r"
+        b"cx-002,2024/01/06,2000,aprobada\r"
+    )
+    processor = CuentasProcessor("test-run")
+    
+    result = processor.process_file(str(csv_file), 0.0)
+    
+    assert result.totales == 2
+    assert result.validos == 2
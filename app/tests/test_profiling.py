@@ -0,0 +1,68 @@
+"""
+Tests para el perfilado bajo demanda
+"""
+import time
+
+from app.profiling import resolve_mode, resolve_top_n, run_profiled
+
+
+def _trabajo(n):
+    fin = time.time() + 0.05
+    total = 0
+    while time.time() < fin:
+        total += sum(range(n))
+    return total
+
+
+def test_resolve_mode():
+    """Test traducción de meta.profile"""
+    assert resolve_mode(True) == "cprofile"
+    assert resolve_mode("yes") == "cprofile"
+    assert resolve_mode(" Sampling ") == "sampling"
+    
+    assert resolve_mode(False) is None
+    assert resolve_mode("false") is None
+    assert resolve_mode("0") is None
+    assert resolve_mode("perf") is None
+
+
+def test_resolve_top_n():
+    """Test tamaño del resumen con valores inválidos"""
+    assert resolve_top_n("5") == 5
+    assert resolve_top_n("muchos") == 20
+    assert resolve_top_n(None) == 20
+
+
+def test_run_profiled_cprofile(tmp_path, monkeypatch):
+    """Test volcado cProfile y resumen top-N"""
+    monkeypatch.chdir(tmp_path)
+    
+    result, perfil = run_profiled("cprofile", 5, _trabajo, 100)
+    
+    assert result > 0
+    assert perfil["modo"] == "cprofile"
+    assert (tmp_path / perfil["volcado"]).stat().st_size > 0
+    resumen = (tmp_path / perfil["resumen"]).read_text(encoding="utf-8")
+    assert "tottime" in resumen
+    assert "_trabajo" in resumen.split("cumulative) ===")[0]
+
+
+def test_run_profiled_sampling(tmp_path, monkeypatch):
+    """Test pilas colapsadas del perfilador por muestreo"""
+    monkeypatch.chdir(tmp_path)
+    
+    _, perfil = run_profiled("sampling", 5, _trabajo, 100)
+    
+    assert "_trabajo" in (tmp_path / perfil["volcado"]).read_text(encoding="utf-8")
+    assert "Muestras:" in (tmp_path / perfil["resumen"]).read_text(encoding="utf-8")
+
+
+def test_run_profiled_replaces_previous_mode(tmp_path, monkeypatch):
+    """Test que un perfil cprofile no deje el volcado de un muestreo anterior"""
+    monkeypatch.chdir(tmp_path)
+    
+    run_profiled("sampling", 5, _trabajo, 100)
+    run_profiled("cprofile", 5, _trabajo, 100)
+    
+    assert not (tmp_path / "out" / "profile.collapsed").exists()
+    assert (tmp_path / "out" / "profile.prof").exists()
@@ -0,0 +1,54 @@
+"""
+Tests de tiempo de arranque del worker
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# En CI lento se puede subir el techo sin cambiar el presupuesto del worker
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_TEST_BUDGET_MS", os.getenv("STARTUP_BUDGET_MS", "250")))
+
+# pika y http.server quedan fuera a propósito: el consumidor se conecta y expone
+# métricas apenas arranca, así que diferirlos solo movería el costo a main()
+LAZY_MODULES = ("pandas", "pydantic", "dateutil", "dotenv")
+
+IMPORT_SCRIPT = f"""
+import sys, time
+t = time.perf_counter()
+import app.main
+heavy = [m for m in {LAZY_MODULES!r} if m in sys.modules]
+print(f"{{(time.perf_counter() - t) * 1000}}|{{','.join(heavy)}}")
+"""
+
+
+def _import_app_main():
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    import_ms, heavy = result.stdout.strip().split("|")
+    return float(import_ms), heavy
+
+
+@pytest.fixture(scope="module")
+def cold_import():
+    """Un único import en frío de app.main compartido por los tests"""
+    return _import_app_main()
+
+
+def test_import_time_within_budget(cold_import):
+    """Test que importar app.main se mantenga bajo el presupuesto configurado"""
+    import_ms, _ = cold_import
+    assert import_ms < STARTUP_BUDGET_MS
+
+
+def test_heavy_modules_are_lazy(cold_import):
+    """Test que pydantic, dateutil y dotenv no se carguen al arrancar"""
+    _, heavy = cold_import
+    assert heavy == ""
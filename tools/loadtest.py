@@ -0,0 +1,248 @@
+"""
+Prueba de carga end-to-end del consumidor con un canal RabbitMQ simulado en proceso
+"""
+import argparse
+import contextlib
+import csv
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import deque
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Sequence
+
+from app.consumer import RabbitMQConsumer
+
+
+ESTADOS = ["pendiente", "ENVIADA", " aprobada ", "Rechazada"]
+
+# Una variante por cada motivo de rechazo del procesador
+FILAS_INVALIDAS = [
+    {"id_cuenta": "  ", "fecha_emision": "2024-01-05", "monto": "100", "estado": "enviada"},
+    {"id_cuenta": "CX-ERR", "fecha_emision": "2024-04-31", "monto": "100", "estado": "enviada"},
+    {"id_cuenta": "CX-ERR", "fecha_emision": "2024/01/05", "monto": "-5", "estado": "enviada"},
+    {"id_cuenta": "CX-ERR", "fecha_emision": "2024/01/05", "monto": "100", "estado": "anulada"},
+]
+
+
+def generate_csv(path: Path, rows: int, error_rate: float, rng: random.Random) -> int:
+    """Genera un CSV de cuentas con una proporción exacta de filas inválidas. Retorna las inválidas"""
+    invalidas = round(rows * error_rate)
+    posiciones = set(rng.sample(range(rows), invalidas))
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["id_cuenta", "fecha_emision", "monto", "estado"])
+        writer.writeheader()
+        for i in range(rows):
+            if i in posiciones:
+                writer.writerow(rng.choice(FILAS_INVALIDAS))
+            else:
+                writer.writerow({
+                    "id_cuenta": f" cx-{i:06d} ",
+                    "fecha_emision": f"{rng.randint(2020, 2025)}/{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}",
+                    "monto": f"{rng.uniform(1, 100000):.2f}".replace(".", rng.choice([".", ","])),
+                    "estado": rng.choice(ESTADOS)
+                })
+    return invalidas
+
+
+class FakeChannel:
+    """Canal en memoria con la interfaz de pika usada por el consumidor"""
+
+    def __init__(self):
+        self.queue = deque()
+        self.callback = None
+        self.acks: List[int] = []
+        self.nacks: List[int] = []
+        self.latencias_s: Dict[int, float] = {}
+        self._next_tag = 1
+
+    def publish(self, body: str) -> int:
+        tag = self._next_tag
+        self._next_tag += 1
+        self.queue.append((tag, body, time.time()))
+        return tag
+
+    def basic_qos(self, prefetch_count: int):
+        pass
+
+    def basic_consume(self, queue: str, on_message_callback, auto_ack: bool = False):
+        self.callback = on_message_callback
+
+    def basic_ack(self, delivery_tag: int):
+        self.acks.append(delivery_tag)
+
+    def basic_nack(self, delivery_tag: int, requeue: bool = True):
+        self.nacks.append(delivery_tag)
+        if requeue:
+            raise AssertionError(f"NACK con requeue del mensaje {delivery_tag}")
+
+    def start_consuming(self):
+        """Entrega los mensajes en cola uno a uno (prefetch=1) hasta vaciarla"""
+        while self.queue:
+            tag, body, published_at = self.queue.popleft()
+            method = SimpleNamespace(delivery_tag=tag)
+            properties = SimpleNamespace(timestamp=int(published_at), content_type="application/json")
+
+            start = time.perf_counter()
+            self.callback(self, method, properties, body.encode("utf-8"))
+            self.latencias_s[tag] = time.perf_counter() - start
+
+
+class FakeConnection:
+    """Reemplazo de RabbitMQConnection que entrega el canal simulado"""
+
+    def __init__(self, channel: FakeChannel, queue_name: str = "rpa.cuentas.normalizar.loadtest"):
+        self.channel = channel
+        self.queue_name = queue_name
+
+    def connect(self) -> FakeChannel:
+        return self.channel
+
+    def close(self):
+        pass
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Percentil por rango más cercano"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[idx]
+
+
+def run_load_test(messages: int, row_sizes: Sequence[int], error_rates: Sequence[float],
+                  umbral: float = 0.15, missing_rate: float = 0.0, seed: int = 42,
+                  workdir: Optional[Path] = None, meta: Optional[Dict] = None,
+                  verbose: bool = False) -> Dict:
+    """Publica N mensajes sobre archivos generados y mide throughput, latencia y ACK/NACK"""
+    rng = random.Random(seed)
+    workdir = Path(workdir or tempfile.mkdtemp(prefix="rpa-loadtest-"))
+    data_dir = workdir / "data"
+    data_dir.mkdir(parents=True, exist_ok=True)
+
+    channel = FakeChannel()
+    esperados: Dict[int, str] = {}
+    filas_totales = 0
+
+    for i in range(messages):
+        rows = rng.choice(row_sizes)
+        error_rate = rng.choice(error_rates)
+        path = data_dir / f"cuentas_{i:05d}.csv"
+
+        if rng.random() < missing_rate:
+            esperado = "nack"
+        else:
+            invalidas = generate_csv(path, rows, error_rate, rng)
+            filas_totales += rows
+            # Un archivo sin filas es válido para el procesador (0% inválidos)
+            esperado = "ack" if (invalidas / rows if rows else 0) <= umbral else "nack"
+
+        payload = {
+            "run_id": f"loadtest-{i:05d}",
+            "archivo": str(path),
+            "operacion": "normalizar",
+            "umbral_error": umbral,
+            "meta": {"fuente": "loadtest", **(meta or {})}
+        }
+        esperados[channel.publish(json.dumps(payload))] = esperado
+
+    consumer = RabbitMQConsumer()
+    consumer.mq = FakeConnection(channel)
+
+    cwd = os.getcwd()
+    try:
+        os.chdir(workdir)
+        with contextlib.ExitStack() as stack:
+            # Descartar la salida de consola sin acumularla en memoria
+            output = sys.stdout if verbose else stack.enter_context(open(os.devnull, "w"))
+            stack.enter_context(contextlib.redirect_stdout(output))
+
+            start = time.perf_counter()
+            consumer.start_consuming()
+            duracion_s = time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+
+    obtenidos = {tag: "ack" for tag in channel.acks}
+    obtenidos.update({tag: "nack" for tag in channel.nacks})
+    incorrectos = [tag for tag, esperado in esperados.items() if obtenidos.get(tag) != esperado]
+    latencias_ms = [s * 1000 for s in channel.latencias_s.values()]
+
+    return {
+        "mensajes": messages,
+        "filas": filas_totales,
+        "ack": len(channel.acks),
+        "nack": len(channel.nacks),
+        "ack_esperados": sum(1 for e in esperados.values() if e == "ack"),
+        "incorrectos": incorrectos,
+        "duracion_s": round(duracion_s, 3),
+        "mensajes_por_s": round(messages / duracion_s, 2) if duracion_s else 0.0,
+        "filas_por_s": round(filas_totales / duracion_s, 2) if duracion_s else 0.0,
+        "latencia_p50_ms": round(percentile(latencias_ms, 50), 2),
+        "latencia_p99_ms": round(percentile(latencias_ms, 99), 2),
+        "workdir": str(workdir)
+    }
+
+
+def main():
+    """Ejecuta la prueba de carga y falla si no se cumple algún umbral"""
+    parser = argparse.ArgumentParser(description="Prueba de carga del consumidor con canal simulado")
+    parser.add_argument("--messages", type=int, default=50, help="Cantidad de mensajes")
+    parser.add_argument("--rows", default="100,1000,10000", help="Tamaños de archivo (filas) separados por coma")
+    parser.add_argument("--error-rates", default="0,0.05,0.3", help="Proporciones de filas inválidas separadas por coma")
+    parser.add_argument("--umbral", type=float, default=0.15, help="Umbral de error (0-1) de cada mensaje")
+    parser.add_argument("--missing-rate", type=float, default=0.0, help="Proporción de mensajes con archivo inexistente")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla del generador")
+    parser.add_argument("--workdir", default=None, help="Directorio de trabajo (temporal si no se provee)")
+    parser.add_argument("--min-msg-s", type=float, default=None, help="Throughput mínimo exigido (mensajes/s)")
+    parser.add_argument("--max-p99-ms", type=float, default=None, help="Latencia p99 máxima exigida (ms)")
+    parser.add_argument("--json", action="store_true", help="Imprime el reporte en JSON")
+    parser.add_argument("--verbose", action="store_true", help="Muestra los logs del consumidor")
+
+    args = parser.parse_args()
+
+    report = run_load_test(
+        messages=args.messages,
+        row_sizes=[int(r) for r in args.rows.split(",")],
+        error_rates=[float(e) for e in args.error_rates.split(",")],
+        umbral=args.umbral,
+        missing_rate=args.missing_rate,
+        seed=args.seed,
+        workdir=Path(args.workdir) if args.workdir else None,
+        verbose=args.verbose
+    )
+
+    fallas = []
+    if report["incorrectos"]:
+        fallas.append(f"{len(report['incorrectos'])} mensajes con ACK/NACK incorrecto")
+    if args.min_msg_s is not None and report["mensajes_por_s"] < args.min_msg_s:
+        fallas.append(f"throughput {report['mensajes_por_s']} msg/s < {args.min_msg_s}")
+    if args.max_p99_ms is not None and report["latencia_p99_ms"] > args.max_p99_ms:
+        fallas.append(f"p99 {report['latencia_p99_ms']} ms > {args.max_p99_ms}")
+
+    if args.json:
+        print(json.dumps({**report, "fallas": fallas}, indent=2, ensure_ascii=False))
+    else:
+        print(f"\n=== Prueba de Carga ===")
+        print(f"Mensajes: {report['mensajes']} ({report['filas']} filas) en {report['duracion_s']} s")
+        print(f"Throughput: {report['mensajes_por_s']} msg/s, {report['filas_por_s']} filas/s")
+        print(f"Latencia: p50 {report['latencia_p50_ms']} ms, p99 {report['latencia_p99_ms']} ms")
+        print(f"ACK: {report['ack']} (esperados {report['ack_esperados']}), NACK: {report['nack']}")
+        print(f"Salidas en: {report['workdir']}")
+        for falla in fallas:
+            print(f"✗ {falla}")
+        if not fallas:
+            print("✓ Prueba de carga superada")
+
+    sys.exit(1 if fallas else 0)
+
+
+if __name__ == "__main__":
+    main()